@@ -1,19 +1,22 @@
 import asyncio
-import json
 import os
+import re
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
 from zoneinfo import ZoneInfo
 from urllib.parse import quote_plus
 
+import orjson
 from tenacity import retry, stop_after_attempt, wait_fixed
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 
 from playwright.async_api import async_playwright, TimeoutError as PWTimeout
-from telegram import Update
+from telegram import Bot, Update
 from telegram.constants import ParseMode
+from telegram.helpers import escape_markdown
 from telegram.ext import (
     ApplicationBuilder, CommandHandler, ContextTypes, MessageHandler, filters
 )
@@ -31,27 +34,83 @@ NAUKRI_PASSWORD = os.environ.get("NAUKRI_PASSWORD", "")
 SEARCH_KEYWORDS = os.environ.get("SEARCH_KEYWORDS", "Software Engineer")
 SEARCH_LOCATION = os.environ.get("SEARCH_LOCATION", "Chennai")
 EXCLUDE_KEYWORDS = os.environ.get("EXCLUDE_KEYWORDS", "")  # comma-separated
+_EXCLUDE_BAD = tuple(x.strip().lower() for x in EXCLUDE_KEYWORDS.split(",") if x.strip())
+_EXCLUDE_RE = re.compile("|".join(map(re.escape, _EXCLUDE_BAD))) if _EXCLUDE_BAD else None
 MAX_APPLICATIONS_PER_RUN = int(os.environ.get("MAX_APPLICATIONS_PER_RUN", "8"))
-
-COOKIES_FILE = Path("cookies.json")
-APPLIED_LOG = Path("applied_log.json")
+APPLY_CONCURRENCY = int(os.environ.get("APPLY_CONCURRENCY", "4"))  # parallel apply tabs
+CYCLE_TIMEOUT_SEC = int(os.environ.get("CYCLE_TIMEOUT_SEC", "900"))  # hard cap per apply cycle
+
+STATE_FILE = Path("state.json")  # cookies + localStorage
+LEGACY_COOKIES_FILE = Path("cookies.json")
+APPLIED_LOG = Path("applied_log.jsonl")  # append-only, one JSON string per line
+LEGACY_APPLIED_LOG = Path("applied_log.json")
+
+# Selector heuristics, defined once so the card wait and the extractor stay in sync
+SEL_JOB_CARD = "article, div.jobTuple, div.srp-jobtuple"
+SEL_APPLY = "a:has-text('Apply'), button:has-text('Apply')"
+SEL_CONFIRM = "button:has-text('Apply'), button:has-text('Submit'), a:has-text('Apply')"
+SEL_LOGGED_IN = "a[title*='My Naukri'], a[title*='Profile'], img[alt*=profile]"
+
+# Heuristics: job cards and apply anchors/buttons. Installed once per context
+# as window.__extract; returns plain data, a.href is already absolute.
+JS_EXTRACTOR_SOURCE = """
+window.__extract = (selector, limit) => Array.from(document.querySelectorAll(selector))
+  .slice(0, limit)
+  .map(card => {
+    const t = card.querySelector('a.title, a[title], h2');
+    const a = (t && t.closest('a[href]')) || card.querySelector('a[href]');
+    return {
+      title: t ? t.innerText : '',
+      href: a ? a.href : null,
+      hasApply: Array.from(card.querySelectorAll('a, button')).some(e => /Apply/i.test(e.innerText)),
+    };
+  });
+"""
+MAX_CARDS_SCANNED = 200
+
+# Results lazy-load on scroll; scroll until the page stops growing (bounded)
+JS_SCROLL_TO_END = """
+async () => {
+  let h = 0;
+  for (let i = 0; i < 10; i++) {
+    window.scrollTo(0, document.body.scrollHeight);
+    await new Promise(r => setTimeout(r, 500));
+    if (document.body.scrollHeight === h) break;
+    h = document.body.scrollHeight;
+  }
+}
+"""
 
 # otp handoff
 OTP_WAIT_SECONDS = 300  # 5 minutes
 _pending_otp_future: asyncio.Future | None = None
 
+# not needed for title/apply extraction; stylesheets stay so visibility checks hold
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+
+# warm browser, kept for the process lifetime (see on_start / on_stop)
+_pw = None
+_browser = None
+_context = None
+# one cycle at a time on the shared context (scheduled runs and /runnow)
+_cycle_lock = asyncio.Lock()
+
+# shared bot (application.bot once main() has built it)
+_bot: Bot | None = None
+
 # ===================== UTIL ===================== #
 
 def _now_ist() -> str:
     return datetime.now(TZ).strftime("%Y-%m-%d %H:%M:%S")
 
+def _md(text) -> str:
+    """Escape dynamic text for MarkdownV2 messages."""
+    return escape_markdown(str(text), version=2)
+
 def _should_skip(title: str) -> bool:
-    if not EXCLUDE_KEYWORDS.strip():
-        return False
-    bad = [x.strip().lower() for x in EXCLUDE_KEYWORDS.split(",") if x.strip()]
-    t = title.lower()
-    return any(b in t for b in bad)
+    return _EXCLUDE_RE is not None and _EXCLUDE_RE.search(title.lower()) is not None
 
+@lru_cache(maxsize=16)
 def _slug_search_url(keywords: str, location: str) -> str:
     # slug-style URL tends to work; also add k= param as fallback
     k = "-".join(keywords.split())
@@ -61,13 +120,32 @@ def _slug_search_url(keywords: str, location: str) -> str:
 def _load_json(path: Path, default):
     if path.exists():
         try:
-            return json.loads(path.read_text())
+            return orjson.loads(path.read_bytes())
         except Exception:
             return default
     return default
 
-def _save_json(path: Path, data):
-    path.write_text(json.dumps(data, indent=2))
+def _load_applied() -> set:
+    if not APPLIED_LOG.exists() and LEGACY_APPLIED_LOG.exists():
+        # one-time migration from the old JSON list; write-then-rename so a
+        # crash can't leave a partial log that hides the legacy file
+        tmp = APPLIED_LOG.with_suffix(APPLIED_LOG.suffix + ".tmp")
+        tmp.write_bytes(b"".join(orjson.dumps(key) + b"\n" for key in _load_json(LEGACY_APPLIED_LOG, [])))
+        os.replace(tmp, APPLIED_LOG)
+    if not APPLIED_LOG.exists():
+        return set()
+    applied = set()
+    for line in APPLIED_LOG.read_bytes().splitlines():
+        try:
+            applied.add(orjson.loads(line))
+        except orjson.JSONDecodeError:
+            # torn last line after a crash; skip it
+            continue
+    return applied
+
+def _append_applied(key: str):
+    with APPLIED_LOG.open("ab") as f:
+        f.write(orjson.dumps(key) + b"\n")
 
 # ===================== TELEGRAM HANDLERS ===================== #
 
@@ -90,21 +168,31 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
 
 async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    applied = _load_json(APPLIED_LOG, [])
+    applied = _load_applied()
     msg = (
-        f"🕒 IST now: {_now_ist()}\n"
-        f"🔎 Keywords: *{SEARCH_KEYWORDS}* | Location: *{SEARCH_LOCATION}*\n"
-        f"🚫 Exclude: *{EXCLUDE_KEYWORDS or '—'}*\n"
+        f"🕒 IST now: {_md(_now_ist())}\n"
+        f"🔎 Keywords: *{_md(SEARCH_KEYWORDS)}* \\| Location: *{_md(SEARCH_LOCATION)}*\n"
+        f"🚫 Exclude: *{_md(EXCLUDE_KEYWORDS or '—')}*\n"
         f"🎯 Max per run: *{MAX_APPLICATIONS_PER_RUN}*\n"
-        f"📦 Cookies saved: *{'Yes' if COOKIES_FILE.exists() else 'No'}*\n"
+        f"📦 Session saved: *{'Yes' if STATE_FILE.exists() else 'No'}*\n"
         f"🗂 Applied log size: *{len(applied)}*"
     )
-    await update.message.reply_text(msg, parse_mode=ParseMode.MARKDOWN)
+    await update.message.reply_text(msg, parse_mode=ParseMode.MARKDOWN_V2)
 
 async def runnow(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    await update.message.reply_text("⏳ Running now…")
-    count, notes = await apply_cycle(context.application)
-    await update.message.reply_text(f"✅ Done. Applied: *{count}*.\n{notes}", parse_mode=ParseMode.MARKDOWN)
+    if _cycle_lock.locked():
+        await update.message.reply_text("⏳ A run is already in progress, results will follow.")
+        return
+    # one message, edited in place with the result instead of a separate summary
+    msg = await update.message.reply_text("⏳ Running now…")
+    count, notes = await apply_cycle(context.application, notify=False)
+    await context.bot.edit_message_text(
+        chat_id=msg.chat_id,
+        message_id=msg.message_id,
+        text=f"✅ Done\\. Applied: *{count}*\\.\n{notes}",
+        parse_mode=ParseMode.MARKDOWN_V2,
+        disable_web_page_preview=True,
+    )
 
 async def otp(update: Update, context: ContextTypes.DEFAULT_TYPE):
     global _pending_otp_future
@@ -121,20 +209,21 @@ async def otp(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 # ===================== CORE BROWSER AUTOMATION ===================== #
 
-async def _ensure_logged_in(page) -> str:
-    """Login if needed; tries cookies first, else credentials (may ask OTP). Returns note."""
-    # Try restore cookies
-    if COOKIES_FILE.exists():
-        try:
-            cookies = json.loads(COOKIES_FILE.read_text())
-            await page.context.add_cookies(cookies)
-        except Exception:
-            pass
+async def _visible(loc, ms: int = 800) -> bool:
+    """True if the locator becomes visible within ms, never raises."""
+    try:
+        await loc.wait_for(state="visible", timeout=ms)
+        return True
+    except Exception:
+        return False
 
+async def _ensure_logged_in(page) -> str:
+    """Login if needed; tries the saved session first, else credentials (may ask OTP). Returns note."""
     await page.goto("https://www.naukri.com/", wait_until="domcontentloaded")
     # Check if logged in (avatar / profile link presence heuristic)
-    if await page.locator("a[title*='My Naukri'], a[title*='Profile'], img[alt*=profile]").first().is_visible(timeout=2000).catch(lambda _: False):
-        return "Used saved cookies"
+    # (short timeout: the link is in the initial HTML or not at all)
+    if await _visible(page.locator(SEL_LOGGED_IN).first, 200):
+        return "Used saved session"
 
     # Open login layer
     try:
@@ -162,7 +251,7 @@ async def _ensure_logged_in(page) -> str:
     # OTP?
     otp_input = page.locator("input[placeholder*='OTP'], input[name*='otp'], input[id*='otp']").first
     try:
-        if await otp_input.is_visible(timeout=4000):
+        if await _visible(otp_input, 4000):
             # ask via Telegram
             await _notify(f"🔐 Naukri asked for OTP. Send it with `/otp 123456` within {OTP_WAIT_SECONDS//60} min.")
             code = await _wait_for_otp()
@@ -172,11 +261,13 @@ async def _ensure_logged_in(page) -> str:
     except PWTimeout:
         pass
 
-    # After login, save cookies
-    await page.wait_for_timeout(3000)
+    # After login, wait for the profile link, then save session (cookies + localStorage)
+    try:
+        await page.wait_for_selector(SEL_LOGGED_IN, timeout=15000)
+    except PWTimeout:
+        pass
     try:
-        cookies = await page.context.cookies()
-        COOKIES_FILE.write_text(json.dumps(cookies))
+        await page.context.storage_state(path=STATE_FILE)
     except Exception:
         pass
 
@@ -184,7 +275,7 @@ async def _ensure_logged_in(page) -> str:
 
 async def _wait_for_otp() -> str:
     global _pending_otp_future
-    _pending_otp_future = asyncio.get_event_loop().create_future()
+    _pending_otp_future = asyncio.get_running_loop().create_future()
     try:
         return await asyncio.wait_for(_pending_otp_future, timeout=OTP_WAIT_SECONDS)
     finally:
@@ -196,142 +287,210 @@ async def _open_results(page, keywords: str, location: str):
     await page.goto(url, wait_until="domcontentloaded", timeout=45000)
 
 async def _collect_jobs(page):
-    # Heuristics: job cards and apply anchors/buttons
-    cards = page.locator("article, div.jobTuple, div.srp-jobtuple, div.list, div.row").all()
+    await page.evaluate(JS_SCROLL_TO_END)
+    # One in-page DOM walk instead of several CDP round-trips per card
+    cards = await page.evaluate("([sel, limit]) => window.__extract(sel, limit)", [SEL_JOB_CARD, MAX_CARDS_SCANNED])
     jobs = []
-    for i in range(min(len(cards), 50)):
-        card = cards[i]
-        try:
-            title = await card.locator("a.title, a[title], a:has(h2), h2").first.text_content(timeout=1000)
-            title = (title or "").strip()
-            if not title:
-                continue
-            if _should_skip(title):
-                continue
-
-            apply_btn = card.locator("a:has-text('Apply'), button:has-text('Apply')").first
-            if not await apply_btn.is_visible(timeout=800).catch(lambda _: False):
-                continue
-
-            href = await card.locator("a[href]").first.get_attribute("href")
-            jobs.append({"title": title, "apply": apply_btn, "href": href})
-        except Exception:
+    seen = set()  # nested/promoted cards can match the selector union twice
+    for card in cards:
+        title = (card.get("title") or "").strip()
+        if not title or not card.get("href") or not card.get("hasApply"):
             continue
+        if card["href"] in seen or _should_skip(title):
+            continue
+        seen.add(card["href"])
+        jobs.append({"title": title, "href": card["href"]})
     return jobs
 
-async def _apply_on_card(apply_btn, context_applied):
+async def _wait_applied(page):
+    # confirmation banner instead of a blind sleep; not every flow shows one
     try:
-        # Clicking sometimes opens a new tab — listen for page
-        async with apply_btn.page.context.expect_page() as new_page_info:
-            await apply_btn.click()
-        newp = await new_page_info.value
-        # If external site, close
-        await newp.wait_for_load_state("domcontentloaded", timeout=15000)
-        url = newp.url
-        if "naukri.com" not in url:
-            await newp.close()
-            return False, "External site — skipped"
-        # Some fast apply flows auto-apply; otherwise look for confirm button
+        await page.wait_for_selector(":text-matches('Applied|Application Sent', 'i'), .success", timeout=5000)
+    except PWTimeout:
+        pass
+
+async def _apply_on_card(context, href: str):
+    """Open the job in its own tab and apply there. Returns (ok, note)."""
+    page = await context.new_page()
+    try:
+        await page.goto(href, wait_until="domcontentloaded", timeout=30000)
+        apply_btn = page.locator(SEL_APPLY).first
+        # Clicking sometimes opens a new tab — listen for a popup of *this* tab only,
+        # other workers' tabs open in the same context
+        popup = asyncio.ensure_future(page.wait_for_event("popup", timeout=5000))
         try:
-            confirm = newp.locator("button:has-text('Apply'), button:has-text('Submit'), a:has-text('Apply')")
-            if await confirm.first.is_visible(timeout=2000):
-                await confirm.first.click()
-        except Exception:
-            pass
-        await asyncio.sleep(1.5)
-        await newp.close()
-        return True, "Applied"
-    except Exception as e:
-        # Try simple click without new tab
+            await apply_btn.click(timeout=5000)
+        except Exception as e:
+            popup.cancel()
+            return False, f"Apply not clickable: {e}"
         try:
-            await apply_btn.click()
-            await asyncio.sleep(1.5)
+            newp = await popup
+        except PWTimeout:
+            # no new tab: applied (or asked to confirm) in place
+            await _wait_applied(page)
             return True, "Applied (same tab)"
-        except Exception as ee:
-            return False, f"Failed: {ee}"
-
-async def apply_cycle(app):
-    """One full run: login -> search -> apply up to N new jobs -> notify"""
-    applied_log = _load_json(APPLIED_LOG, [])
-    applied_set = set(applied_log)
-
-    notes = []
-    count = 0
+        try:
+            # If external site, close
+            await newp.wait_for_load_state("domcontentloaded", timeout=15000)
+            if "naukri.com" not in newp.url:
+                return False, "External site — skipped"
+            # Some fast apply flows auto-apply; otherwise look for confirm button
+            try:
+                confirm = newp.locator(SEL_CONFIRM)
+                if await _visible(confirm.first, 2000):
+                    await confirm.first.click()
+            except Exception:
+                pass
+            await _wait_applied(newp)
+            return True, "Applied"
+        finally:
+            await newp.close()
+    except Exception as e:
+        return False, f"Failed: {e}"
+    finally:
+        await page.close()
+
+async def _apply_one(context, job, sem: asyncio.Semaphore, run: dict):
+    async with sem:
+        ok, msg = await _apply_on_card(context, job["href"])
+    # record as each apply finishes so a timed-out cycle can still report it
+    if ok:
+        # persist right away so a crash mid-cycle doesn't re-apply
+        _append_applied(job["href"] or job["title"])
+        run["count"] += 1
+        run["notes"].append(f"✅ {_md(job['title'][:70])}…")
+    else:
+        run["notes"].append(f"⛔ {_md(job['title'][:70])}… – {_md(msg)}")
 
-    async with async_playwright() as pw:
-        browser = await pw.chromium.launch(headless=True, args=["--no-sandbox", "--disable-dev-shm-usage"])
-        context = await browser.new_context()
-        page = await context.new_page()
+async def apply_cycle(app, notify: bool = True):
+    """One full run, cancelled (tabs closed) if it exceeds CYCLE_TIMEOUT_SEC.
 
+    notify=False leaves the summary to the caller (returned in notes)."""
+    async with _cycle_lock:
+        run = {"count": 0, "notes": []}  # filled in as the cycle progresses
+        try:
+            return await asyncio.wait_for(_apply_cycle_inner(app, run, notify), timeout=CYCLE_TIMEOUT_SEC)
+        except asyncio.TimeoutError:
+            notes = run["notes"] + [_md(f"⏱ Apply cycle timed out after {CYCLE_TIMEOUT_SEC // 60} min.")]
+            if notify:
+                status = f"🎯 Applied before timeout: *{run['count']}*"
+                await _notify(status + "\n" + "\n".join(notes[-10:]), markdown=True)
+            return run["count"], "\n".join(notes)
+
+async def _apply_cycle_inner(app, run: dict, notify: bool = True):
+    """login -> search -> apply up to N new jobs -> notify"""
+    applied_set = _load_applied()
+    notes = run["notes"]
+
+    await _ensure_browser()
+    page = await _context.new_page()
+    try:
         note = await _ensure_logged_in(page)
-        notes.append(f"🔑 {note}")
+        notes.append(f"🔑 {_md(note)}")
 
         await _open_results(page, SEARCH_KEYWORDS, SEARCH_LOCATION)
-        await page.wait_for_timeout(3000)
+        try:
+            await page.wait_for_selector(SEL_JOB_CARD, timeout=15000, state="visible")
+        except PWTimeout:
+            pass  # reported below as "no jobs found"
 
         jobs = await _collect_jobs(page)
         if not jobs:
-            await browser.close()
-            await _notify(f"⚠️ No jobs found for *{SEARCH_KEYWORDS}* in *{SEARCH_LOCATION}*.", markdown=True)
+            notes.append(f"⚠️ No jobs found for *{_md(SEARCH_KEYWORDS)}* in *{_md(SEARCH_LOCATION)}*\\.")
+            if notify:
+                await _notify(notes[-1], markdown=True)
             return 0, "\n".join(notes)
 
-        for job in jobs:
-            if count >= MAX_APPLICATIONS_PER_RUN:
-                break
-            key = job["href"] or job["title"]
-            if key in applied_set:
-                continue
-            ok, msg = await _apply_on_card(job["apply"], applied_set)
-            if ok:
-                count += 1
-                applied_set.add(key)
-                notes.append(f"✅ {job['title'][:70]}…")
-            else:
-                notes.append(f"⛔ {job['title'][:70]}… – {msg}")
-
-        # persist log
-        _save_json(APPLIED_LOG, list(applied_set))
-
-        await browser.close()
-
-    status = f"🕒 {_now_ist()} IST\n🔎 *{SEARCH_KEYWORDS}* in *{SEARCH_LOCATION}*\n🎯 Applied this run: *{count}*"
-    await _notify(status + ("\n" + "\n".join(notes[-10:]) if notes else ""), markdown=True)
-    return count, "\n".join(notes)
+        # drop already-applied listings before opening any tabs
+        new_jobs = [j for j in jobs if (j["href"] or j["title"]) not in applied_set][:MAX_APPLICATIONS_PER_RUN]
+        if not new_jobs:
+            notes.append(f"ℹ️ No new jobs for *{_md(SEARCH_KEYWORDS)}* in *{_md(SEARCH_LOCATION)}* \\({len(jobs)} already applied\\)\\.")
+            if notify:
+                await _notify(notes[-1], markdown=True)
+            return 0, "\n".join(notes)
+
+        sem = asyncio.Semaphore(APPLY_CONCURRENCY)
+        results = await asyncio.gather(*(_apply_one(_context, j, sem, run) for j in new_jobs), return_exceptions=True)
+        for job, res in zip(new_jobs, results):
+            if isinstance(res, Exception):
+                notes.append(f"⛔ {_md(job['title'][:70])}… – {_md(f'Failed: {res}')}")
+    finally:
+        await page.close()
+
+    if notify:
+        status = f"🕒 {_md(_now_ist())} IST\n🔎 *{_md(SEARCH_KEYWORDS)}* in *{_md(SEARCH_LOCATION)}*\n🎯 Applied this run: *{run['count']}*"
+        await _notify(status + ("\n" + "\n".join(notes[-10:]) if notes else ""), markdown=True)
+    return run["count"], "\n".join(notes)
 
 # ===================== NOTIFY ===================== #
 
 async def _notify(text: str, markdown: bool = False):
     if not TELEGRAM_CHAT_ID:
         return
-    from telegram import Bot
-    bot = Bot(token=TELEGRAM_BOT_TOKEN)
-    try:
-        await bot.send_message(
-            chat_id=TELEGRAM_CHAT_ID,
-            text=text,
-            parse_mode=ParseMode.MARKDOWN if markdown else None,
-            disable_web_page_preview=True,
-        )
-    except Exception:
-        # Fallback plain text
-        await bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=text)
+    bot = _bot or Bot(token=TELEGRAM_BOT_TOKEN)
+    # markdown=True callers pre-escape dynamic parts with _md()
+    await bot.send_message(
+        chat_id=TELEGRAM_CHAT_ID,
+        text=text,
+        parse_mode=ParseMode.MARKDOWN_V2 if markdown else None,
+        disable_web_page_preview=True,
+    )
 
 # ===================== APP BOOT ===================== #
 
+async def _block_heavy(route):
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def _start_browser():
+    global _pw, _browser, _context
+    if _pw is None:
+        _pw = await async_playwright().start()
+    _browser = await _pw.chromium.launch(headless=True, args=["--no-sandbox", "--disable-dev-shm-usage"])
+    if STATE_FILE.exists():
+        state = STATE_FILE
+    elif LEGACY_COOKIES_FILE.exists():
+        # one-time migration: old deployments only saved cookies
+        state = {"cookies": _load_json(LEGACY_COOKIES_FILE, []), "origins": []}
+    else:
+        state = None
+    _context = await _browser.new_context(storage_state=state)
+    await _context.route("**/*", _block_heavy)
+    await _context.add_init_script(script=JS_EXTRACTOR_SOURCE)
+
+async def _ensure_browser():
+    # relaunch lazily if Chromium crashed or disconnected since the last cycle
+    if _browser is None or not _browser.is_connected():
+        await _start_browser()
+
 async def on_start(app):
+    await _start_browser()
     # Schedule at 08:00 and 20:00 IST daily
     sched = AsyncIOScheduler(timezone=TZ)
-    sched.add_job(lambda: asyncio.create_task(apply_cycle(app)),
-                  CronTrigger(hour=8, minute=0, second=0, timezone=TZ), id="am8")
-    sched.add_job(lambda: asyncio.create_task(apply_cycle(app)),
-                  CronTrigger(hour=20, minute=0, second=0, timezone=TZ), id="pm8")
+    # coroutine jobs: the scheduler awaits them, logs errors and never overlaps runs
+    sched.add_job(apply_cycle, CronTrigger(hour=8, minute=0, second=0, timezone=TZ), args=[app],
+                  id="am8", max_instances=1, coalesce=True, misfire_grace_time=600)
+    sched.add_job(apply_cycle, CronTrigger(hour=20, minute=0, second=0, timezone=TZ), args=[app],
+                  id="pm8", max_instances=1, coalesce=True, misfire_grace_time=600)
     sched.start()
     await _notify("🤖 Bot started. I will auto-apply at 8:00 AM and 8:00 PM IST.", markdown=False)
 
+async def on_stop(app):
+    global _pw, _browser, _context
+    if _browser:
+        await _browser.close()
+    if _pw:
+        await _pw.stop()
+    _pw = _browser = _context = None
+
 def main():
+    global _bot
     if not TELEGRAM_BOT_TOKEN:
         raise SystemExit("TELEGRAM_BOT_TOKEN is required")
     application = ApplicationBuilder().token(TELEGRAM_BOT_TOKEN).build()
+    _bot = application.bot
 
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("status", status))
@@ -340,6 +499,7 @@ def main():
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, lambda *_: None))
 
     application.post_init = on_start
+    application.post_shutdown = on_stop
     application.run_polling(close_loop=False)
 
 if __name__ == "__main__":